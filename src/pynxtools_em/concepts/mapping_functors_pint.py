@@ -18,9 +18,8 @@
 """Utilities for working with NeXus concepts encoded as Python dicts in the concepts dir."""
 
 from datetime import datetime
-from typing import Any, Dict
+from typing import Any, Dict, Mapping
 
-import flatdict as fd
 import numpy as np
 import pytz
 from pynxtools_em.utils.get_file_checksum import get_sha256_of_file_content
@@ -234,7 +233,7 @@ def set_value(template: dict, trg: str, src_val: Any, trg_dtype: str = "") -> di
 
 
 def use_functor(
-    cmds: list, mdata: fd.FlatDict, prfx_trg: str, ids: list, template: dict
+    cmds: list, mdata: Mapping, prfx_trg: str, ids: list, template: dict
 ) -> dict:
     """Process concept mapping for simple predefined strings and pint quantities."""
     for cmd in cmds:
@@ -250,7 +249,7 @@ def use_functor(
 
 def map_functor(
     cmds: list,
-    mdata: fd.FlatDict,
+    mdata: Mapping,
     prfx_src: str,
     prfx_trg: str,
     ids: list,
@@ -388,7 +387,7 @@ def map_functor(
 
 def timestamp_functor(
     cmds: list,
-    mdata: fd.FlatDict,
+    mdata: Mapping,
     prfx_src: str,
     prfx_trg: str,
     ids: list,
@@ -421,7 +420,7 @@ def timestamp_functor(
 
 def filehash_functor(
     cmds: list,
-    mdata: fd.FlatDict,
+    mdata: Mapping,
     prfx_src: str,
     prfx_trg: str,
     ids: list,
@@ -451,7 +450,7 @@ def filehash_functor(
 
 
 def add_specific_metadata_pint(
-    cfg: dict, mdata: fd.FlatDict, ids: list, template: dict
+    cfg: dict, mdata: Mapping, ids: list, template: dict
 ) -> dict:
     """Map specific concept src on specific NeXus concept trg.
 
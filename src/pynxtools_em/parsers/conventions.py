@@ -17,8 +17,6 @@
 #
 """Parse conventions from an ELN schema instance."""
 
-import pathlib
-
 import flatdict as fd
 import yaml
 from pynxtools_em.concepts.mapping_functors_pint import add_specific_metadata_pint
@@ -40,9 +38,7 @@ class NxEmConventionParser:
     def __init__(self, file_path: str, entry_id: int = 1, verbose: bool = False):
         """Fill template with ELN pieces of information."""
         print(f"Extracting conventions from {file_path} ...")
-        if pathlib.Path(file_path).name.endswith("conventions.yaml") or pathlib.Path(
-            file_path
-        ).name.endswith("conventions.yml"):
+        if file_path.endswith(("conventions.yaml", "conventions.yml")):
             self.file_path = file_path
             self.entry_id = entry_id if entry_id > 0 else 1
             self.verbose = verbose
@@ -18,17 +18,21 @@
 
 """Parse Nion-specific content in a file containing a zip-compressed nionswift project."""
 
-import glob
+import hashlib
+import io
 import json
 import mmap
-from typing import Dict, List
-from zipfile import ZipFile
+import os
+import shutil
+import tempfile
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import closing
+from typing import IO, Callable, Dict, Generator, List, Optional, Tuple, Union
+from zipfile import ZipFile, ZipInfo
 
-import flatdict as fd
 import h5py
 import nion.swift.model.NDataHandler as nsnd
 import numpy as np
-import yaml
 from pynxtools_em.concepts.mapping_functors_pint import add_specific_metadata_pint
 from pynxtools_em.configurations.nion_cfg import (
     NION_DYNAMIC_ABERRATION_NX,
@@ -44,21 +48,77 @@ from pynxtools_em.configurations.nion_cfg import (
     NION_WHICH_IMAGE,
     NION_WHICH_SPECTRUM,
 )
+from pynxtools_em.utils.dict_utils import flatten_dict
 from pynxtools_em.utils.get_file_checksum import (
     DEFAULT_CHECKSUM_ALGORITHM,
+    DEFAULT_CHECKSUM_BLOCK_SIZE,
     get_sha256_of_file_content,
 )
 from pynxtools_em.utils.nion_utils import (
+    load_nionswift_project,
     nion_image_spectrum_or_generic_nxdata,
+    read_ndata_array,
     uuid_to_file_name,
+    walk_files,
 )
-from pynxtools_em.utils.pint_custom_unit_registry import ureg
+from pynxtools_em.utils.numerics import get_linear_axes
+from pynxtools_em.utils.pint_custom_unit_registry import get_unit
+
+NION_READ_BUFFER_SIZE = 1 << 20  # 1 MiB
+# at most two members are held in memory at a time, the one being mapped on the
+# template and the one decompressed ahead of it, larger go to temporary files
+NION_IN_MEMORY_MAX_SIZE = 1 << 26  # 64 MiB
+NION_FILE_TYPES = {
+    ".h5": "hfive",
+    ".hdf": "hfive",
+    ".hdf5": "hfive",
+    ".ndata": "ndata",
+    ".nsproj": "nsproj",
+}
+NION_DATA_FILE_TYPES = frozenset(["hfive", "ndata"])
+NION_DISPLAY_ITEM_REQUIRED_KEYS = frozenset(
+    ["type", "uuid", "created", "display_data_channels"]
+)
+# per unit_combination NXspectrum/NXimage group below an NXevent_data_em, name of the
+# signal, axis names, and long_name of unitless axes, resolved once at import time
+NION_NXDATA_PROTOTYPES: Dict[str, Tuple[str, str, Tuple[str, ...], str]] = {
+    **{
+        key: (
+            f"IMAGE_SET[image_set1]/{val[0]}",
+            "real",
+            tuple(val[1]),
+            "Image identifier",
+        )
+        for key, val in NION_WHICH_IMAGE.items()
+    },
+    **{
+        key: (
+            f"SPECTRUM_SET[spectrum_set1]/{val[0]}",
+            "intensity",
+            tuple(val[1]),
+            "Spectrum identifier",
+        )
+        for key, val in NION_WHICH_SPECTRUM.items()
+    },
+}
+# axis names of generic NXdata indexed by the number of dimensions minus one
+NION_GENERIC_AXIS_NAMES = tuple(
+    tuple(["axis_i", "axis_j", "axis_k", "axis_l", "axis_m"][0:ndim][::-1])
+    for ndim in range(1, 6)
+)
+
+
+class SeekableMmap(mmap.mmap):
+    """Read-only memory map which ZipFile accepts as a seekable file object."""
+
+    def seekable(self) -> bool:
+        return True
 
 
 class NionProjectParser:
     """Parse (zip-compressed archive of a) nionswift project with its content."""
 
-    def __init__(self, file_path: str = "", entry_id: int = 1, verbose: bool = True):
+    def __init__(self, file_path: str = "", entry_id: int = 1, verbose: bool = False):
         """Class wrapping swift parser."""
         if file_path:
             self.file_path = file_path
@@ -77,9 +137,51 @@ class NionProjectParser:
         # just get the *.h5 files irrespective whether parsed later or not
         self.supported = False
         self.is_zipped = False
+        self.zip_file_hdl: Optional[ZipFile] = None
+        self.zip_mmap: Optional[SeekableMmap] = None
+        # ZipFile reads the central directory and members from this memory map
+        self.zip_member_info: Dict[str, ZipInfo] = {}
+        # ZipInfo of each *.h5, *.ndata, *.nsproj member, snapshot during the check
+        # the ZIP file is opened once by check_if_nionswift_project and kept open
+        # until parse is done to parse its central directory only once
         self.check_if_nionswift_project()
         # eventually allow https://github.com/miurahr/py7zr/ to work with 7z directly
 
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Release the handle to the ZIP file and its memory map if any."""
+        if self.zip_file_hdl is not None:
+            self.zip_file_hdl.close()
+            self.zip_file_hdl = None
+        if self.zip_mmap is not None:
+            self.zip_mmap.close()
+            self.zip_mmap = None
+
+    def open_zip_file(self):
+        """Memory-map the ZIP file and read its central directory unless already open."""
+        if self.zip_file_hdl is not None:
+            return True
+        try:
+            # the memory map stays open until close, it holds its own file handle
+            with open(self.file_path, "rb", 0) as fp:
+                self.zip_mmap = SeekableMmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        except (FileNotFoundError, IOError, ValueError):
+            print(f"{self.file_path} either FileNotFound or IOError !")
+            return False
+        # https://en.wikipedia.org/wiki/List_of_file_signatures
+        if self.zip_mmap[0:4] != b"PK\x03\x04":
+            self.close()
+            return False
+        # ZipFile seeks and reads on the memory map, central directory lookups
+        # and member reads are served from mapped pages instead of read calls
+        self.zip_file_hdl = ZipFile(self.zip_mmap)
+        return True
+
     def check_if_nionswift_project(self):
         """Inspect the content of the compressed project file to check if supported."""
         self.supported = False
@@ -94,282 +196,347 @@ class NionProjectParser:
             return
 
         if self.is_zipped:
-            try:
-                with open(self.file_path, "rb", 0) as fp:
-                    s = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
-                    magic = s.read(4)
-                    if (
-                        magic != b"PK\x03\x04"
-                    ):  # https://en.wikipedia.org/wiki/List_of_file_signatures
-                        return
-                    if self.verbose:
-                        fp.seek(0, 2)
-                        eof_byte_offset = fp.tell()
-                        print(
-                            f"Expecting zip-compressed file: ___{self.file_path}___{magic}___{get_sha256_of_file_content(fp)}___{eof_byte_offset}___"
-                        )
-            except (FileNotFoundError, IOError):
-                print(f"{self.file_path} either FileNotFound or IOError !")
+            if not self.open_zip_file():
                 return
+            zip_file_hdl = self.zip_file_hdl
+            if self.verbose:
+                # hashed zero-copy via the memory map, kept for reuse
+                self.file_path_sha256 = get_sha256_of_file_content(self.zip_mmap)
+                print(
+                    f"Expecting zip-compressed file: ___{self.file_path}___{self.zip_mmap[0:4]!r}___{self.file_path_sha256}___{len(self.zip_mmap)}___"
+                )
 
             # analyze information content of the project and its granularization
-            with ZipFile(self.file_path) as zip_file_hdl:
-                for file in zip_file_hdl.namelist():
-                    if file.endswith((".h5", ".hdf", ".hdf5")):
-                        with zip_file_hdl.open(file) as fp:
-                            magic = fp.read(8)
-                            if self.verbose:
-                                fp.seek(0, 2)
-                                eof_byte_offset = fp.tell()
-                                print(
-                                    f"Expecting hfive: ___{file}___{magic}___{get_sha256_of_file_content(fp)}___{eof_byte_offset}___"
-                                )
-                            key = file[file.rfind("/") + 1 :].replace(".h5", "")
-                            if key not in self.hfive_file_dict:
-                                self.hfive_file_dict[key] = file
-                    elif file.endswith(".ndata"):
-                        with zip_file_hdl.open(file) as fp:
-                            magic = fp.read(8)
-                            if self.verbose:
-                                fp.seek(0, 2)
-                                eof_byte_offset = fp.tell()
-                                print(
-                                    f"Expecting ndata: ___{file}___{magic}___{get_sha256_of_file_content(fp)}___{eof_byte_offset}___"
-                                )
-                            key = file[file.rfind("/") + 1 :].replace(".ndata", "")
-                            if key not in self.ndata_file_dict:
-                                self.ndata_file_dict[key] = file
-                    elif file.endswith(".nsproj"):
-                        with zip_file_hdl.open(file) as fp:
-                            magic = fp.read(8)
-                            if self.verbose:
-                                fp.seek(0, 2)
-                                eof_byte_offset = fp.tell()
-                                print(
-                                    f"Expecting nsproj: ___{file}___{magic}___{get_sha256_of_file_content(fp)}___{eof_byte_offset}___"
-                                )
-                            key = file[file.rfind("/") + 1 :].replace(".nsproj", "")
-                            if key not in self.proj_file_dict:
-                                self.proj_file_dict[key] = file
-                    else:
-                        continue
+            report: List[str] = []  # verbose per-member lines, written at once
+            for zinfo in zip_file_hdl.infolist():
+                file_type = NION_FILE_TYPES.get(
+                    os.path.splitext(zinfo.filename)[1].lower()
+                )
+                if file_type is None:
+                    continue
+                self.zip_member_info[zinfo.filename] = zinfo
+                if self.verbose:
+                    with zip_file_hdl.open(zinfo) as fp:
+                        report.append(self.inspect_file(zinfo.filename, file_type, fp))
+                self.register_file(zinfo.filename, file_type)
+            if report:
+                print("\n".join(report))
         else:
             nsproj_data_path = f"{self.file_path[0:self.file_path.rfind('.')]} Data"
-            print(f"nsproj_data_path __{nsproj_data_path}__")
-            for file in glob.glob(f"{nsproj_data_path}/**/*", recursive=True):
-                print(f"----->>>> {file}")
-                if file.endswith((".h5", ".hdf", ".hdf5")):
-                    with open(file, "rb") as fp:
-                        magic = fp.read(8)
-                        if self.verbose:
-                            fp.seek(0, 2)
-                            eof_byte_offset = fp.tell()
-                            # get_sha256_of_file_content(fp)
-                            print(
-                                f"Expecting hfive: ___{file}___{magic}___{get_sha256_of_file_content(fp)}___{eof_byte_offset}___"
-                            )
-                        key = file[file.rfind("/") + 1 :].replace(".h5", "")
-                        if key not in self.hfive_file_dict:
-                            self.hfive_file_dict[key] = file
-                elif file.endswith(".ndata"):
-                    with open(file, "rb") as fp:
-                        magic = fp.read(8)
-                        if self.verbose:
-                            fp.seek(0, 2)
-                            eof_byte_offset = fp.tell()
-                            print(
-                                f"Expecting ndata: ___{file}___{magic}___{get_sha256_of_file_content(fp)}___{eof_byte_offset}___"
-                            )
-                        key = file[file.rfind("/") + 1 :].replace(".ndata", "")
-                        if key not in self.ndata_file_dict:
-                            self.ndata_file_dict[key] = file
+            report = []
+            if self.verbose:
+                print(f"nsproj_data_path __{nsproj_data_path}__")
+            for file in walk_files(nsproj_data_path):
+                if self.verbose:
+                    report.append(f"----->>>> {file}")
+                file_type = NION_FILE_TYPES.get(os.path.splitext(file)[1].lower())
+                if file_type not in NION_DATA_FILE_TYPES:
+                    continue
+                if self.verbose:
+                    with open(file, "rb", 0) as fp:
+                        if os.path.getsize(file) == 0:
+                            # empty files cannot be memory-mapped
+                            report.append(self.inspect_file(file, file_type, fp))
+                        else:
+                            with mmap.mmap(
+                                fp.fileno(), 0, access=mmap.ACCESS_READ
+                            ) as mm:
+                                report.append(self.inspect_file(file, file_type, mm))
+                self.register_file(file, file_type)
+            if report:
+                print("\n".join(report))
 
         if not self.ndata_file_dict.keys().isdisjoint(self.hfive_file_dict.keys()):
             print(
                 "Test 2 failed, UUID keys of *.ndata and *.h5 files in project are not disjoint!"
             )
+            self.close()
             return
         if self.is_zipped and len(self.proj_file_dict.keys()) != 1:
             print(
                 "Test 3 failed, he project contains either no or more than one nsproj file!"
             )
+            self.close()
             return
         print(
             f"Content in zip-compressed nionswift project {self.file_path} passed all tests"
         )
         self.supported = True
         if self.verbose:
-            for key, val in self.proj_file_dict.items():
-                print(f"nsprj: ___{key}___{val}___")
-            for key, val in self.ndata_file_dict.items():
-                print(f"ndata: ___{key}___{val}___")
-            for key, val in self.hfive_file_dict.items():
-                print(f"hfive: ___{key}___{val}___")
+            # one write for all lines instead of one per registered file
+            lines = []
+            for prefix, file_dict in (
+                ("nsprj", self.proj_file_dict),
+                ("ndata", self.ndata_file_dict),
+                ("hfive", self.hfive_file_dict),
+            ):
+                lines.extend(
+                    f"{prefix}: ___{key}___{val}___" for key, val in file_dict.items()
+                )
+            print("\n".join(lines))
+
+    def inspect_file(self, file_name: str, file_type: str, file_hdl) -> str:
+        """Report magic bytes, size, and SHA256 of a file in one pass over its content."""
+        if isinstance(file_hdl, mmap.mmap):
+            # hash the memory map as a whole, no copies of the content into blocks
+            magic = file_hdl[0:8]
+            file_size = len(file_hdl)
+            sha256_hash = hashlib.sha256(file_hdl)
+        else:
+            magic = file_hdl.read(8)
+            file_size = len(magic)
+            sha256_hash = hashlib.sha256(magic)
+            for byte_block in iter(
+                lambda: file_hdl.read(DEFAULT_CHECKSUM_BLOCK_SIZE), b""
+            ):
+                sha256_hash.update(byte_block)
+                file_size += len(byte_block)
+        return f"Expecting {file_type}: ___{file_name}___{magic!r}___{sha256_hash.hexdigest()}___{file_size}___"
+
+    def register_file(self, file_name: str, file_type: str):
+        """Register a *.h5, *.ndata, or *.nsproj file of the project by its key."""
+        file_dict = {
+            "hfive": self.hfive_file_dict,
+            "ndata": self.ndata_file_dict,
+            "nsproj": self.proj_file_dict,
+        }[file_type]
+        # the first file registered for a key wins
+        file_dict.setdefault(
+            os.path.splitext(os.path.basename(file_name))[0], file_name
+        )
+
+    def get_file_path(self, file_hdl) -> Optional[str]:
+        """Path under which the file behind file_hdl can be opened again if any."""
+        # files on disk are opened again by path to use native file access, e.g. the
+        # HDF5 file driver or a memory map, instead of Python file object callbacks,
+        # this includes the temporary files of large ZIP members on POSIX
+        file_path = getattr(file_hdl, "name", None)
+        if isinstance(file_path, str) and (
+            os.name == "posix" or isinstance(file_hdl, io.BufferedReader)
+        ):
+            return file_path
+        return None
 
     def process_ndata(self, file_hdl, full_path, template) -> dict:
         """Handle reading and processing of opened *.ndata inside the ZIP file."""
         # assure that we start reading that file_hdl/pointer from the beginning...
         file_hdl.seek(0)
         local_files, dir_files, eocd = nsnd.parse_zip(file_hdl)
-        flat_metadata = fd.FlatDict({}, "/")
         print(
             f"Inspecting {full_path} with len(local_files.keys()) ___{len(local_files.keys())}___"
         )
-        for offset, tpl in local_files.items():
-            if self.verbose:
-                print(f"{offset}___{tpl}")
-            # report to know there are more than metadata.json files in the ndata swift container format
-            if tpl[0] == b"metadata.json":
-                if self.verbose:
-                    print(
-                        f"Extract metadata.json from ___{full_path}___ at offset ___{offset}___"
-                    )
-                # ... explicit jump back to beginning of the file
-                file_hdl.seek(0)
-                flat_metadata = fd.FlatDict(
-                    nsnd.read_json(file_hdl, local_files, dir_files, b"metadata.json"),
-                    "/",
-                )
+        if self.verbose:
+            # previously used to log the analysis of all datasets that were collected
+            # in the last 5years on the NionHermes within the HU EM group lead by
+            # C. Koch and team, specifically we exported the metadata to learn about a
+            # much larger usage variety to guide the implementation of this parser,
+            # we expected though always to find only one file named metadata.json in
+            # that *.ndata file pointed to by file_hdl
+            print("\n".join(f"{offset}___{tpl}" for offset, tpl in local_files.items()))
+        # parse_zip indexes the central directory by file name, i.e. name ->
+        # (offset of the central directory record, offset of the local file header)
+        if b"metadata.json" not in dir_files:
+            return template
+        metadata_offset = dir_files[b"metadata.json"][1]
+        data_offset = dir_files[b"data.npy"][1] if b"data.npy" in dir_files else None
 
-                if self.verbose:
-                    print(f"Flattened content of this metadata.json")
-                    for key, value in flat_metadata.items():
-                        print(f"ndata, metadata.json, flat: ___{key}___{value}___")
-                else:
-                    break
-                # previously no break here because we used verbose == True to log the analysis
-                # of all datasets that were collected in the last 5years on the NionHermes
-                # within the HU EM group lead by C. Koch and team, specifically we exported the
-                # metadata to learn about a much larger usage variety to guide the
-                # implementation of this parser, we expected though always to find only
-                # one file named metadata.json in that *.ndata file pointed to by file_hdl
-        if len(flat_metadata) == 0:
+        if self.verbose:
+            print(
+                f"Extract metadata.json from ___{full_path}___ at offset ___{metadata_offset}___"
+            )
+        # ... explicit jump back to beginning of the file
+        file_hdl.seek(0)
+        metadata = nsnd.read_json(file_hdl, local_files, dir_files, b"metadata.json")
+        if not metadata:
+            return template
+        flat_metadata = flatten_dict(metadata)
+        if self.verbose:
+            print(f"Flattened content of this metadata.json")
+            print(
+                "\n".join(
+                    f"ndata, metadata.json, flat: ___{key}___{value}___"
+                    for key, value in flat_metadata.items()
+                )
+            )
+        if data_offset is None:
             return template
 
-        for offset, tpl in local_files.items():
-            if tpl[0] == b"data.npy":
-                if self.verbose:
-                    print(
-                        f"Extract data.npy from ___{full_path}___ at offset ___{offset}___"
-                    )
-                file_hdl.seek(0)
-                nparr = nsnd.read_data(file_hdl, local_files, dir_files, b"data.npy")
-                if isinstance(nparr, np.ndarray):
-                    print(
-                        f"ndata, data.npy, type, shape, dtype: ___{type(nparr)}___{np.shape(nparr)}___{nparr.dtype}___"
-                    )
-                # because we expect (based on Benedikt's example) to find only one npy
-                # file in that *.ndata file pointed to by file_hdl and only one matching
-                # metadata.json we can now write the data and its metadata into template
-                self.process_event_data_em_metadata(flat_metadata, template)
-                self.process_event_data_em_data(nparr, flat_metadata, template)
-                break
+        if self.verbose:
+            print(
+                f"Extract data.npy from ___{full_path}___ at offset ___{data_offset}___"
+            )
+        file_hdl.seek(0)
+        nparr = read_ndata_array(
+            file_hdl,
+            local_files,
+            dir_files,
+            b"data.npy",
+            self.get_file_path(file_hdl),
+        )
+        if self.verbose and isinstance(nparr, np.ndarray):
+            print(
+                f"ndata, data.npy, type, shape, dtype: ___{type(nparr)}___{np.shape(nparr)}___{nparr.dtype}___"
+            )
+        # because we expect (based on Benedikt's example) to find only one npy
+        # file in that *.ndata file pointed to by file_hdl and only one matching
+        # metadata.json we can now write the data and its metadata into template
+        self.process_event_data_em_metadata(flat_metadata, template)
+        self.process_event_data_em_data(nparr, flat_metadata, template)
         return template
 
     def process_hfive(self, file_hdl, full_path, template: dict) -> dict:
         """Handle reading and processing of opened *.h5 inside the ZIP file."""
-        flat_metadata = fd.FlatDict({}, "/")
-        file_hdl.seek(0)
-        with h5py.File(file_hdl, "r") as h5r:
+        h5_src = self.get_file_path(file_hdl)
+        if h5_src is None:
+            file_hdl.seek(0)
+            h5_src = file_hdl
+        with h5py.File(h5_src, "r") as h5r:
             print(
                 f"Inspecting {full_path} with len(h5r.keys()) ___{len(h5r.keys())}___"
             )
-            print(f"{h5r.keys()}")
-            flat_metadata = fd.FlatDict(
-                json.loads(h5r["data"].attrs["properties"]), "/"
-            )
             if self.verbose:
-                print(f"Flattened content of this metadata.json")
-                for key, value in flat_metadata.items():
-                    print(f"hfive, data, flat: ___{key}___{value}___")
-
-            if len(flat_metadata) == 0:
+                print(f"{h5r.keys()}")
+            # resolve the dataset only once, pass it and not h5r["data"][()] on to
+            # avoid that the array is read and decompressed when it cannot be mapped
+            dst = h5r["data"]
+            # json.loads takes the attribute value as str or bytes as is
+            metadata = json.loads(dst.attrs["properties"])
+            if not metadata:
                 return template
 
+            flat_metadata = flatten_dict(metadata)
+            if self.verbose:
+                print(f"Flattened content of this metadata.json")
+                print(
+                    "\n".join(
+                        f"hfive, data, flat: ___{key}___{value}___"
+                        for key, value in flat_metadata.items()
+                    )
+                )
+
             self.process_event_data_em_metadata(flat_metadata, template)
 
-            nparr = h5r["data"][()]
-            if isinstance(nparr, np.ndarray):
+            if self.verbose:
                 print(
-                    f"hfive, data, type, shape, dtype: ___{type(nparr)}___{np.shape(nparr)}___{nparr.dtype}___"
+                    f"hfive, data, type, shape, dtype: ___{type(dst)}___{dst.shape}___{dst.dtype}___"
                 )
-            self.process_event_data_em_data(nparr, flat_metadata, template)
+            self.process_event_data_em_data(dst, flat_metadata, template)
         return template
 
-    def parse_project_file(self, template: dict) -> dict:
-        """Parse lazily from compressed NionSwift project (nsproj + directory)."""
+    def open_member(self, file_name: str):
+        """Open a file of the project either from within the ZIP file or directly."""
+        if self.is_zipped:
+            zip_file_hdl = self.zip_file_hdl
+            # each backward seek in a ZipExtFile restarts the decompression from the
+            # beginning of the member, h5py and nsnd.parse_zip seek a lot though,
+            # so decompress the member once into memory or, if large, a temporary file
+            zinfo = self.zip_member_info[file_name]
+            if zinfo.file_size <= NION_IN_MEMORY_MAX_SIZE:
+                # BytesIO shares the buffer of the bytes object until written to
+                return io.BytesIO(zip_file_hdl.read(zinfo))
+            # a named temporary file can be opened by h5py via its path and thus with
+            # its native file driver but only on POSIX systems, Windows denies a
+            # second open of a temporary file while it is open
+            file_hdl = (
+                tempfile.NamedTemporaryFile()
+                if os.name == "posix"
+                else tempfile.TemporaryFile()
+            )
+            with zip_file_hdl.open(zinfo) as fp:
+                shutil.copyfileobj(fp, file_hdl, NION_READ_BUFFER_SIZE)
+            file_hdl.seek(0)
+            return file_hdl
+        # h5py and nsnd.parse_zip issue many small reads, use a larger buffer
+        return open(file_name, "rb", buffering=NION_READ_BUFFER_SIZE)
+
+    def open_members(self, file_names: List[str]) -> Generator[IO[bytes], None, None]:
+        """Open files of the project in order, decompressing ZIP members ahead."""
+        if not self.is_zipped:
+            for file_name in file_names:
+                yield self.open_member(file_name)
+            return
+        # mapping onto the template stays sequential, only the decompression of the
+        # next member, during which zlib releases the GIL, overlaps with it, a single
+        # worker assures that the ZipFile is never read from two threads at a time
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            ahead: Optional[Future] = None
+            try:
+                for file_name in file_names:
+                    current, ahead = ahead, executor.submit(self.open_member, file_name)
+                    if current is not None:
+                        yield current.result()
+                if ahead is not None:
+                    current, ahead = ahead, None
+                    yield current.result()
+            finally:
+                # when the generator is closed early, e.g. because processing the
+                # current member failed, the member decompressed ahead of it is
+                # waited for and closed before the ZipFile is closed
+                if ahead is not None and ahead.exception() is None:
+                    ahead.result().close()
+
+    def parse_display_items(self, template: dict) -> dict:
+        """Parse the nsproj file and process the data files of all display_items."""
         nionswift_proj_mdata = {}
         if self.is_zipped:
-            with ZipFile(self.file_path) as zip_file_hdl:
-                for pkey, proj_file_name in self.proj_file_dict.items():
-                    with zip_file_hdl.open(proj_file_name) as file_hdl:
-                        nionswift_proj_mdata = fd.FlatDict(
-                            yaml.safe_load(file_hdl), "/"
-                        )
+            zip_file_hdl = self.zip_file_hdl
+            for pkey, proj_file_name in self.proj_file_dict.items():
+                with zip_file_hdl.open(proj_file_name) as file_hdl:
+                    nionswift_proj_mdata = load_nionswift_project(file_hdl)
         else:
-            with open(self.file_path) as file_hdl:
-                nionswift_proj_mdata = fd.FlatDict(yaml.safe_load(file_hdl), "/")
+            with open(self.file_path, "rb") as file_hdl:
+                nionswift_proj_mdata = load_nionswift_project(file_hdl)
+        if not nionswift_proj_mdata:
+            return template
         # TODO::inspection phase, maybe with yaml to file?
         if self.verbose:
             if self.is_zipped:
                 print(f"Flattened content of {proj_file_name}")
             else:
                 print(f"Flattened content of {self.file_path}")
-            for key, value in nionswift_proj_mdata.items():  # ["display_items"]:
-                print(f"nsprj, flat: ___{key}___{value}___")
-        if nionswift_proj_mdata == {}:
-            return template
+            # flattening is only needed for this inspection
+            print(
+                "\n".join(
+                    f"nsprj, flat: ___{key}___{value}___"
+                    for key, value in flatten_dict(nionswift_proj_mdata).items()
+                )
+            )
 
+        # first resolve which data file each display_item refers to
+        data_files: List[Tuple[str, Callable]] = []  # file name, processing method
         for itm in nionswift_proj_mdata["display_items"]:
-            if set(["type", "uuid", "created", "display_data_channels"]).issubset(
-                itm.keys()
-            ):
+            if NION_DISPLAY_ITEM_REQUIRED_KEYS <= itm.keys():
                 if len(itm["display_data_channels"]) == 1:
-                    if "data_item_reference" in itm["display_data_channels"][0].keys():
+                    if "data_item_reference" in itm["display_data_channels"][0]:
                         key = uuid_to_file_name(
                             itm["display_data_channels"][0]["data_item_reference"]
                         )
                         # file_name without the mime type
-                        if key in self.ndata_file_dict.keys():
+                        if key in self.ndata_file_dict:
                             this_file = self.ndata_file_dict[key]
                             print(f"Key {key} is *.ndata maps to {this_file}")
-                            print(f"Parsing {this_file}...")
-                            if self.is_zipped:
-                                with ZipFile(self.file_path) as zip_file_hdl:
-                                    with zip_file_hdl.open(this_file) as file_hdl:
-                                        self.process_ndata(
-                                            file_hdl,
-                                            this_file,
-                                            template,
-                                        )
-                            else:
-                                with open(this_file, "rb") as file_hdl:
-                                    self.process_ndata(
-                                        file_hdl,
-                                        this_file,
-                                        template,
-                                    )
-                        elif key in self.hfive_file_dict.keys():
+                            data_files.append((this_file, self.process_ndata))
+                        elif key in self.hfive_file_dict:
                             this_file = self.hfive_file_dict[key]
                             print(f"Key {key} is *.h5 maps to {this_file}")
-                            print(f"Parsing {this_file}...")
-                            if self.is_zipped:
-                                with ZipFile(self.file_path) as zip_file_hdl:
-                                    with zip_file_hdl.open(this_file) as file_hdl:
-                                        self.process_hfive(
-                                            file_hdl,
-                                            this_file,
-                                            template,
-                                        )
-                            else:
-                                with open(this_file, "rb") as file_hdl:
-                                    self.process_hfive(
-                                        file_hdl,
-                                        this_file,
-                                        template,
-                                    )
+                            data_files.append((this_file, self.process_hfive))
                         else:
                             print(f"Key {key} has no corresponding data file")
+        # only file names are needed from here on, release the possibly large
+        # project metadata before the data arrays are loaded
+        del nionswift_proj_mdata
+        if self.is_zipped:
+            # visit the members in the order in which they are stored in the ZIP file
+            # so that the archive is read sequentially instead of jumping around
+            data_files.sort(key=lambda tpl: self.zip_member_info[tpl[0]].header_offset)
+
+        # closing the generator also on errors shuts down its worker before parse
+        # closes the ZipFile and the memory map which the worker reads from
+        with closing(self.open_members([tpl[0] for tpl in data_files])) as file_hdls:
+            for (this_file, process), file_hdl in zip(data_files, file_hdls):
+                print(f"Parsing {this_file}...")
+                with file_hdl:
+                    process(file_hdl, this_file, template)
         return template
 
     def parse(self, template: dict) -> dict:
@@ -381,11 +548,17 @@ class NionProjectParser:
                 )
             else:
                 print("Parsing in-place nionswift project (nsproj + data)...")
-            self.parse_project_file(template)
+            # the ZIP file is opened again if a previous parse has closed it already
+            if self.is_zipped and not self.open_zip_file():
+                return template
+            try:
+                self.parse_display_items(template)
+            finally:
+                self.close()
         return template
 
     def process_event_data_em_metadata(
-        self, flat_metadata: fd.FlatDict, template: dict
+        self, flat_metadata: dict, template: dict
     ) -> dict:
         print(f"Mapping some of the Nion metadata on respective NeXus concepts...")
         # we assume for now dynamic quantities can just be repeated
@@ -419,16 +592,22 @@ class NionProjectParser:
         return template
 
     def process_event_data_em_data(
-        self, nparr: np.ndarray, flat_metadata: fd.FlatDict, template: dict
+        self,
+        nparr: Union[np.ndarray, h5py.Dataset],
+        flat_metadata: dict,
+        template: dict,
     ) -> dict:
         """Map Nion-specifically formatted data arrays on NeXus NXdata/NXimage/NXspectrum."""
         axes = flat_metadata["dimensional_calibrations"]
         unit_combination = nion_image_spectrum_or_generic_nxdata(axes)
-        print(f"{unit_combination}, {np.shape(nparr)}")
-        print(axes)
-        print(f"entry_id {self.entry_id}, event_id {self.id_mgn['event_id']}")
+        if self.verbose:
+            print(f"{unit_combination}, {np.shape(nparr)}")
+            print(axes)
+            print(f"entry_id {self.entry_id}, event_id {self.id_mgn['event_id']}")
         if unit_combination == "":
             return template
+        # materialize h5py.Dataset only now, for np.ndarray this is a no-op
+        nparr = np.asarray(nparr)
 
         prfx = f"/ENTRY[entry{self.entry_id}]/measurement/event_data_em_set/EVENT_DATA_EM[event_data_em{self.id_mgn['event_id']}]"
         self.id_mgn["event_id"] += 1
@@ -436,21 +615,14 @@ class NionProjectParser:
         # this is the place when you want to skip individually the writing of NXdata
         # return template
 
-        axis_names = None
-        if unit_combination in NION_WHICH_SPECTRUM:
-            trg = f"{prfx}/SPECTRUM_SET[spectrum_set1]/{NION_WHICH_SPECTRUM[unit_combination][0]}"
+        if unit_combination in NION_NXDATA_PROTOTYPES:
+            group, signal, axis_names, unitless_long_name = NION_NXDATA_PROTOTYPES[
+                unit_combination
+            ]
+            trg = f"{prfx}/{group}"
             template[f"{trg}/title"] = f"{flat_metadata['title']}"
-            template[f"{trg}/@signal"] = f"intensity"
-            template[f"{trg}/intensity"] = {"compress": nparr, "strength": 1}
-            axis_names = NION_WHICH_SPECTRUM[unit_combination][1]
-        elif unit_combination in NION_WHICH_IMAGE:
-            trg = (
-                f"{prfx}/IMAGE_SET[image_set1]/{NION_WHICH_IMAGE[unit_combination][0]}"
-            )
-            template[f"{trg}/title"] = f"{flat_metadata['title']}"
-            template[f"{trg}/@signal"] = f"real"  # TODO::unless COMPLEX
-            template[f"{trg}/real"] = {"compress": nparr, "strength": 1}
-            axis_names = NION_WHICH_IMAGE[unit_combination][1]
+            template[f"{trg}/@signal"] = signal  # TODO::unless COMPLEX for images
+            template[f"{trg}/{signal}"] = {"compress": nparr, "strength": 1}
         elif not any(
             (value in ["1/", "iteration"]) for value in unit_combination.split(";")
         ):
@@ -459,9 +631,8 @@ class NionProjectParser:
             template[f"{trg}/@NX_class"] = f"NXdata"
             template[f"{trg}/@signal"] = f"data"
             template[f"{trg}/data"] = {"compress": nparr, "strength": 1}
-            axis_names = ["axis_i", "axis_j", "axis_k", "axis_l", "axis_m"][
-                0 : len(unit_combination.split("_"))
-            ][::-1]
+            axis_names = NION_GENERIC_AXIS_NAMES[unit_combination.count("_")]
+            unitless_long_name = ""
         else:
             print(f"WARNING::{unit_combination} unsupported unit_combination !")
             return template
@@ -469,55 +640,34 @@ class NionProjectParser:
         if len(axis_names) >= 1:
             # arrays axis_names and dimensional_calibrations are aligned in order
             # but that order is reversed wrt to AXISNAME_indices !
-            for idx, axis_name in enumerate(axis_names):
-                template[f"{trg}/@AXISNAME_indices[{axis_name}_indices]"] = np.uint32(
-                    len(axis_names) - 1 - idx
-                )
-            template[f"{trg}/@axes"] = axis_names
+            for axis_name, axis_idx in zip(
+                axis_names, np.arange(len(axis_names) - 1, -1, -1, dtype=np.uint32)
+            ):
+                template[f"{trg}/@AXISNAME_indices[{axis_name}_indices]"] = axis_idx
+            template[f"{trg}/@axes"] = list(axis_names)
 
+            axis_values = get_linear_axes(
+                [axis["offset"] for axis in axes],
+                [axis["scale"] for axis in axes],
+                np.shape(nparr)[0 : len(axes)],
+            )
             for idx, axis in enumerate(axes):
                 axis_name = axis_names[idx]
-                offset = axis["offset"]
-                step = axis["scale"]
+                axis_trg = f"{trg}/AXISNAME[{axis_name}]"
                 units = axis["units"]
-                count = np.shape(nparr)[idx]
+                template[axis_trg] = axis_values[idx]
                 if units == "":
-                    template[f"{trg}/AXISNAME[{axis_name}]"] = np.asarray(
-                        offset
-                        + np.linspace(0, count - 1, num=count, endpoint=True) * step,
-                        dtype=np.float32,
-                    )
-                    if unit_combination in NION_WHICH_SPECTRUM:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Spectrum identifier"
-                        )
-                    elif unit_combination in NION_WHICH_IMAGE:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Image identifier"
-                        )
-                    else:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"{axis_name}"
-                            # unitless | dimensionless i.e. no unit in longname
-                        )
+                    # unitless | dimensionless i.e. no unit in longname
+                    template[f"{axis_trg}/@long_name"] = unitless_long_name or axis_name
                 else:
-                    template[f"{trg}/AXISNAME[{axis_name}]"] = np.asarray(
-                        offset
-                        * np.linspace(0, count - 1, num=count, endpoint=True)
-                        * step,
-                        dtype=np.float32,
-                    )
-                    template[f"{trg}/AXISNAME[{axis_name}]/@units"] = (
-                        f"{ureg.Unit(units)}"
-                    )
+                    unit = get_unit(units)
+                    template[f"{axis_trg}/@units"] = f"{unit}"
                     if units == "eV":
                         # TODO::this is only robust if Nion reports always as eV and not with other prefix like kilo etc.
                         # in such case the solution from the gatan parser is required, i.e. conversion to base units
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Energy ({ureg.Unit(units)})"  # eV
-                        )
+                        template[f"{axis_trg}/@long_name"] = f"Energy ({unit})"  # eV
                     else:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Point coordinate along {axis_name} ({ureg.Unit(units)})"
+                        template[f"{axis_trg}/@long_name"] = (
+                            f"Point coordinate along {axis_name} ({unit})"
                         )
         return template
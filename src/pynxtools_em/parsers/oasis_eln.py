@@ -17,10 +17,6 @@
 #
 """Parser generic ELN content serialized as eln_data.yaml to NeXus NXem."""
 
-import pathlib
-
-import flatdict as fd
-import yaml
 from pynxtools_em.concepts.mapping_functors_pint import add_specific_metadata_pint
 from pynxtools_em.configurations.eln_cfg import (
     OASISELN_EM_ENTRY_TO_NEXUS,
@@ -28,10 +24,9 @@ from pynxtools_em.configurations.eln_cfg import (
     OASISELN_EM_USER_IDENTIFIER_TO_NEXUS,
     OASISELN_EM_USER_TO_NEXUS,
 )
-from pynxtools_em.utils.get_file_checksum import (
-    DEFAULT_CHECKSUM_ALGORITHM,
-    get_sha256_of_file_content,
-)
+from pynxtools_em.utils.dict_utils import flatten_dict
+from pynxtools_em.utils.get_file_checksum import DEFAULT_CHECKSUM_ALGORITHM
+from pynxtools_em.utils.yaml_utils import load_yaml_file
 
 
 class NxEmNomadOasisElnSchemaParser:
@@ -42,25 +37,29 @@ class NxEmNomadOasisElnSchemaParser:
     """
 
     def __init__(self, file_path: str = "", entry_id: int = 1, verbose: bool = False):
-        if pathlib.Path(file_path).name.endswith("eln_data.yaml") or pathlib.Path(
-            file_path
-        ).name.endswith("eln_data.yml"):
+        if file_path.endswith(("eln_data.yaml", "eln_data.yml")):
             self.file_path = file_path
         self.entry_id = entry_id if entry_id > 0 else 1
         self.verbose = verbose
-        self.flat_metadata = fd.FlatDict({}, "/")
+        self.flat_metadata: dict = {}
+        self.file_path_sha256 = None
         self.supported = False
         self.check_if_supported()
 
     def check_if_supported(self):
         self.supported = False
         try:
-            with open(self.file_path, "r", encoding="utf-8") as stream:
-                self.flat_metadata = fd.FlatDict(yaml.safe_load(stream), delimiter="/")
+            # the SHA256 is taken from the same read which the content is parsed from
+            content, self.file_path_sha256 = load_yaml_file(self.file_path)
+            self.flat_metadata = flatten_dict(content or {})
 
-                if self.verbose:
-                    for key, val in self.flat_metadata.items():
-                        print(f"key: {key}, value: {val}")
+            if self.verbose and self.flat_metadata:
+                print(
+                    "\n".join(
+                        f"key: {key}, value: {val}"
+                        for key, val in self.flat_metadata.items()
+                    )
+                )
             self.supported = True
         except (FileNotFoundError, IOError):
             print(f"{self.file_path} either FileNotFound or IOError !")
@@ -69,8 +68,6 @@ class NxEmNomadOasisElnSchemaParser:
     def parse(self, template: dict) -> dict:
         """Copy data from self into template the appdef instance."""
         if self.supported:
-            with open(self.file_path, "rb", 0) as fp:
-                self.file_path_sha256 = get_sha256_of_file_content(fp)
             print(
                 f"Parsing {self.file_path} NOMAD Oasis/ELN with SHA256 {self.file_path_sha256} ..."
             )
@@ -98,27 +95,30 @@ class NxEmNomadOasisElnSchemaParser:
     def parse_user(self, template: dict) -> dict:
         """Copy data from user section into template."""
         src = "user"
-        if src in self.flat_metadata:
-            if isinstance(self.flat_metadata[src], list):
-                if all(isinstance(entry, dict) for entry in self.flat_metadata[src]):
-                    user_id = 1
-                    # custom schema delivers a list of dictionaries...
-                    for user_dict in self.flat_metadata[src]:
-                        if len(user_dict) == 0:
-                            continue
-                        identifier = [self.entry_id, user_id]
-                        add_specific_metadata_pint(
-                            OASISELN_EM_USER_TO_NEXUS,
-                            user_dict,
-                            identifier,
-                            template,
-                        )
-                        if "orcid" in user_dict:
-                            add_specific_metadata_pint(
-                                OASISELN_EM_USER_IDENTIFIER_TO_NEXUS,
-                                user_dict,
-                                identifier,
-                                template,
-                            )
-                        user_id += 1
+        if not isinstance(self.flat_metadata.get(src), list):
+            return template
+        user_id = 1
+        # add_specific_metadata_pint only reads identifier, so one list is reused
+        identifier = [self.entry_id, user_id]
+        # custom schema delivers a list of dictionaries...
+        for user_dict in self.flat_metadata[src]:
+            if not isinstance(user_dict, dict):
+                continue
+            if not user_dict:
+                continue
+            identifier[1] = user_id
+            add_specific_metadata_pint(
+                OASISELN_EM_USER_TO_NEXUS,
+                user_dict,
+                identifier,
+                template,
+            )
+            if "orcid" in user_dict:
+                add_specific_metadata_pint(
+                    OASISELN_EM_USER_IDENTIFIER_TO_NEXUS,
+                    user_dict,
+                    identifier,
+                    template,
+                )
+            user_id += 1
         return template
@@ -46,13 +46,16 @@ class RsciioBrukerParser:
     def check_if_supported(self):
         """Check if provided content matches Bruker concepts."""
         self.supported = False
+        file_ext = self.file_path.lower().rsplit(".", 1)[-1]
+        if file_ext not in ("bcf", "spx"):
+            return
         try:
-            self.objs = bruker.file_reader(self.file_path)
-            # TODO::what to do if the content of the file is larger than the available
-            # main memory, one approach to handle this is to have the file_reader parsing
-            # only the collection of the concepts without the actual instance data
-            # based on this one could then plan how much memory has to be reserved
-            # in the template and stream out accordingly
+            with open(self.file_path, "rb", 0) as fp:
+                magic = fp.read(8)
+            # BCF is a Bruker SFS container, SPX is XML read as a whole by
+            # rosettasciio, content is read via rosettasciio only when parse is called
+            if file_ext == "bcf" and magic != b"AAMVHFSS":
+                return
             self.supported = True
         except (FileNotFoundError, IOError):
             print(f"{self.file_path} either FileNotFound or IOError !")
@@ -61,6 +64,13 @@ class RsciioBrukerParser:
     def parse(self, template: dict) -> dict:
         """Perform actual parsing filling cache."""
         if self.supported:
+            # TODO::what to do if the content of the file is larger than the available
+            # main memory, one approach to handle this is to have the file_reader parsing
+            # only the collection of the concepts without the actual instance data
+            # based on this one could then plan how much memory has to be reserved
+            # in the template and stream out accordingly
+            if not self.objs:
+                self.objs = bruker.file_reader(self.file_path)
             with open(self.file_path, "rb", 0) as fp:
                 self.file_path_sha256 = get_sha256_of_file_content(fp)
             print(
@@ -17,9 +17,8 @@
 #
 """Parser for reading content from Gatan Digital Micrograph *.dm3 and *.dm4 (HDF5) via rosettasciio."""
 
-from typing import Dict, List
+from typing import Dict, List, Tuple
 
-import flatdict as fd
 import numpy as np
 from pynxtools_em.concepts.mapping_functors_pint import add_specific_metadata_pint
 from pynxtools_em.configurations.rsciio_gatan_cfg import (
@@ -28,15 +27,43 @@ from pynxtools_em.configurations.rsciio_gatan_cfg import (
     GATAN_WHICH_IMAGE,
     GATAN_WHICH_SPECTRUM,
 )
+from pynxtools_em.utils.dict_utils import flatten_dict
 from pynxtools_em.utils.gatan_utils import gatan_image_spectrum_or_generic_nxdata
 from pynxtools_em.utils.get_file_checksum import (
     DEFAULT_CHECKSUM_ALGORITHM,
     get_sha256_of_file_content,
 )
-from pynxtools_em.utils.pint_custom_unit_registry import ureg
+from pynxtools_em.utils.numerics import get_linear_axis
+from pynxtools_em.utils.pint_custom_unit_registry import get_base_unit, get_unit
 from pynxtools_em.utils.rsciio_hspy_utils import all_req_keywords_in_dict
 from rsciio import digitalmicrograph as gatan
 
+# per unit_combination NXspectrum_set/NXimage_set group below an NXevent_data_em, the
+# NXspectrum/NXimage therein, name of the signal, axis names, and long_name of
+# unitless axes, resolved once at import time
+GATAN_NXDATA_PROTOTYPES: Dict[str, Tuple[str, str, str, Tuple[str, ...], str]] = {
+    **{
+        key: (
+            "IMAGE_SET[image_set1]",
+            val[0],
+            "real",
+            tuple(val[1]),
+            "Image identifier",
+        )
+        for key, val in GATAN_WHICH_IMAGE.items()
+    },
+    **{
+        key: (
+            "SPECTRUM_SET[spectrum_set1]",
+            val[0],
+            "intensity",
+            tuple(val[1]),
+            "Spectrum identifier",
+        )
+        for key, val in GATAN_WHICH_SPECTRUM.items()
+    },
+}
+
 
 class RsciioGatanParser:
     """Read Gatan Digital Micrograph dm3/dm4 formats."""
@@ -48,6 +75,7 @@ class RsciioGatanParser:
         self.verbose = verbose
         self.id_mgn: Dict[str, int] = {"event_id": 1}
         self.version: Dict = {}
+        self.obj_idx_supported: List[int] = []
         self.supported = False
         self.check_if_supported()
         if not self.supported:
@@ -60,25 +88,35 @@ class RsciioGatanParser:
         if not self.file_path.lower().endswith(("dm3", "dm4")):
             return
         try:
-            self.objs = gatan.file_reader(
-                self.file_path, lazy=False, order="C", optimize=True
-            )
-            # TODO::what to do if the content of the file is larger than the available
-            # main memory, make use of lazy loading
+            with open(self.file_path, "rb", 0) as fp:
+                # DigitalMicrograph files start with their version as big-endian int32
+                if fp.read(4) not in (b"\x00\x00\x00\x03", b"\x00\x00\x00\x04"):
+                    return
+            # lazy loading materializes only the metadata, the arrays are read
+            # one object at a time when these are mapped on the template
+            try:
+                self.objs = gatan.file_reader(
+                    self.file_path, lazy=True, order="C", optimize=True
+                )
+            except ValueError:
+                # rosettasciio cannot load RGB(A) images, DataType 8 and 23, lazily
+                self.objs = gatan.file_reader(
+                    self.file_path, lazy=False, order="C", optimize=True
+                )
 
             reqs = ["data", "axes", "metadata", "original_metadata", "mapping"]
-            obj_idx_supported: List[int] = []
+            self.obj_idx_supported = []
             for idx, obj in enumerate(self.objs):
                 if not isinstance(obj, dict):
                     continue
                 if not all_req_keywords_in_dict(obj, reqs):
                     continue
-                # flat_metadata = fd.FlatDict(obj["original_metadata"], "/")
+                # flat_metadata = flatten_dict(obj["original_metadata"])
                 # TODO::add version distinction logic from rsciio_velox
-                obj_idx_supported.append(idx)
+                self.obj_idx_supported.append(idx)
                 if self.verbose:
                     print(f"{idx}-th obj is supported")
-            if len(obj_idx_supported) > 0:  # at least some supported content
+            if len(self.obj_idx_supported) > 0:  # at least some supported content
                 self.supported = True
         except (FileNotFoundError, IOError):
             print(f"{self.file_path} either FileNotFound or IOError !")
@@ -97,12 +135,9 @@ class RsciioGatanParser:
 
     def parse_content(self, template: dict) -> dict:
         """Translate tech partner concepts to NeXus concepts."""
-        reqs = ["data", "axes", "metadata", "original_metadata", "mapping"]
-        for idx, obj in enumerate(self.objs):
-            if not isinstance(obj, dict):
-                continue
-            if not all_req_keywords_in_dict(obj, reqs):
-                continue
+        # objs have been checked for the required keywords in check_if_supported
+        for idx in self.obj_idx_supported:
+            obj = self.objs[idx]
             self.process_event_data_em_metadata(obj, template)
             self.process_event_data_em_data(obj, template)
             self.id_mgn["event_id"] += 1
@@ -115,7 +150,7 @@ class RsciioGatanParser:
         # use an own function for each instead of a loop of a template function call
         # as for each section there are typically always some extra formatting
         # steps required
-        flat_metadata = fd.FlatDict(obj["original_metadata"], "/")
+        flat_metadata = flatten_dict(obj["original_metadata"])
         identifier = [self.entry_id, self.id_mgn["event_id"], 1]
         for cfg in [GATAN_DYNAMIC_STAGE_NX, GATAN_DYNAMIC_VARIOUS_NX]:
             add_specific_metadata_pint(cfg, flat_metadata, identifier, template)
@@ -138,122 +173,88 @@ class RsciioGatanParser:
         # assume rosettasciio-specific formatting of the obj informationemd parser
         # i.e. a dictionary with the following keys:
         # "data", "axes", "metadata", "original_metadata", "mapping"
-        flat_hspy_meta = fd.FlatDict(obj["metadata"], "/")
-        if "General/title" not in flat_hspy_meta:
+        # only the title is read from the hyperspy metadata, which is not worth flattening
+        hspy_general = obj["metadata"].get("General", {})
+        if not isinstance(hspy_general, dict) or "title" not in hspy_general:
             return template
+        title = f"{hspy_general['title']}"
 
-        # flat_orig_meta = fd.FlatDict(obj["original_metadata"], "/")
+        # flat_orig_meta = flatten_dict(obj["original_metadata"])
         axes = obj["axes"]
         unit_combination = gatan_image_spectrum_or_generic_nxdata(axes)
         if unit_combination == "":
             return template
+        # shape is known without reading the array, also for lazily loaded objs
+        shape = obj["data"].shape
         if self.verbose:
             print(axes)
-            print(f"{unit_combination}, {np.shape(obj['data'])}")
+            print(f"{unit_combination}, {shape}")
             print(f"entry_id {self.entry_id}, event_id {self.id_mgn['event_id']}")
 
+        data = np.asarray(obj["data"])
         prfx = f"/ENTRY[entry{self.entry_id}]/measurement/event_data_em_set/EVENT_DATA_EM[event_data_em{self.id_mgn['event_id']}]"
         self.id_mgn["event_id"] += 1
 
         # this is the place when you want to skip individually the writing of NXdata
         # return template
 
-        axis_names = None
-        if unit_combination in GATAN_WHICH_SPECTRUM:
-            self.annotate_information_source(
-                f"{prfx}/SPECTRUM_SET[spectrum_set1]",
-                self.file_path,
-                self.file_path_sha256,
-                template,
+        if unit_combination in GATAN_NXDATA_PROTOTYPES:
+            group, nxdata, signal, axis_names, unitless_long_name = (
+                GATAN_NXDATA_PROTOTYPES[unit_combination]
             )
-            trg = f"{prfx}/SPECTRUM_SET[spectrum_set1]/{GATAN_WHICH_SPECTRUM[unit_combination][0]}"
-            template[f"{trg}/title"] = f"{flat_hspy_meta['General/title']}"
-            template[f"{trg}/@signal"] = f"intensity"
-            template[f"{trg}/intensity"] = {"compress": obj["data"], "strength": 1}
-            axis_names = GATAN_WHICH_SPECTRUM[unit_combination][1]
-        elif unit_combination in GATAN_WHICH_IMAGE:
             self.annotate_information_source(
-                f"{prfx}/IMAGE_SET[image_set1]",
-                self.file_path,
-                self.file_path_sha256,
-                template,
+                f"{prfx}/{group}", self.file_path, self.file_path_sha256, template
             )
-            trg = (
-                f"{prfx}/IMAGE_SET[image_set1]/{GATAN_WHICH_IMAGE[unit_combination][0]}"
-            )
-            template[f"{trg}/title"] = f"{flat_hspy_meta['General/title']}"
-            template[f"{trg}/@signal"] = f"real"  # TODO::unless COMPLEX
-            template[f"{trg}/real"] = {"compress": obj["data"], "strength": 1}
-            axis_names = GATAN_WHICH_IMAGE[unit_combination][1]
+            trg = f"{prfx}/{group}/{nxdata}"
+            template[f"{trg}/title"] = title
+            template[f"{trg}/@signal"] = signal  # TODO::unless COMPLEX for images
+            template[f"{trg}/{signal}"] = {"compress": data, "strength": 1}
         else:
             self.annotate_information_source(
                 f"{prfx}/DATA[data1]", self.file_path, self.file_path_sha256, template
             )
             trg = f"{prfx}/DATA[data1]"
-            template[f"{trg}/title"] = f"{flat_hspy_meta['General/title']}"
+            template[f"{trg}/title"] = title
             template[f"{trg}/@NX_class"] = f"NXdata"
             template[f"{trg}/@signal"] = f"data"
-            template[f"{trg}/data"] = {"compress": obj["data"], "strength": 1}
-            axis_names = ["axis_i", "axis_j", "axis_k", "axis_l", "axis_m"][
-                0 : len(unit_combination.split("_"))
-            ]  # mind, different to Nion and other tech partners here no [::-1] reversal
+            template[f"{trg}/data"] = {"compress": data, "strength": 1}
+            unitless_long_name = ""
+            axis_names = tuple(
+                ["axis_i", "axis_j", "axis_k", "axis_l", "axis_m"][
+                    0 : len(unit_combination.split("_"))
+                ]
+            )  # mind, different to Nion and other tech partners here no [::-1] reversal
             # of the indices 241.a2c338fd458e6b7023ec946a5e3ce8c85bd2befcb5d17dae7ae5f44b2dede81b.dm4
             # is a good example!
 
         if len(axis_names) >= 1:
             # arrays axis_names and dimensional_calibrations are aligned in order
             # but that order is reversed wrt to AXISNAME_indices !
-            for idx, axis_name in enumerate(axis_names):
-                template[f"{trg}/@AXISNAME_indices[{axis_name}_indices]"] = np.uint32(
-                    len(axis_names) - 1 - idx
-                )  # TODO::check with dissimilarly sized data array if this is idx !
-            template[f"{trg}/@axes"] = axis_names
+            # TODO::check with dissimilarly sized data array if this is idx !
+            for axis_name, axis_idx in zip(
+                axis_names, np.arange(len(axis_names) - 1, -1, -1, dtype=np.uint32)
+            ):
+                template[f"{trg}/@AXISNAME_indices[{axis_name}_indices]"] = axis_idx
+            template[f"{trg}/@axes"] = list(axis_names)
 
             for idx, axis in enumerate(axes):
                 axis_name = axis_names[idx]
                 offset = axis["offset"]
                 step = axis["scale"]
                 units = axis["units"]
-                count = np.shape(obj["data"])[idx]
+                count = shape[idx]
+                axis_trg = f"{trg}/AXISNAME[{axis_name}]"
+                template[axis_trg] = get_linear_axis(offset, step, count)
                 if units == "":
-                    template[f"{trg}/AXISNAME[{axis_name}]"] = np.asarray(
-                        offset
-                        * np.linspace(0, count - 1, num=count, endpoint=True)
-                        * step,
-                        dtype=np.float32,
-                    )
-                    if unit_combination in GATAN_WHICH_SPECTRUM:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Spectrum identifier"
-                        )
-                    elif unit_combination in GATAN_WHICH_IMAGE:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Image identifier"
-                        )
-                    else:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"{axis_name}"
-                            # unitless | dimensionless i.e. no unit in longname
-                        )
+                    # unitless | dimensionless i.e. no unit in longname
+                    template[f"{axis_trg}/@long_name"] = unitless_long_name or axis_name
                 else:
-                    template[f"{trg}/AXISNAME[{axis_name}]"] = np.asarray(
-                        offset
-                        * np.linspace(0, count - 1, num=count, endpoint=True)
-                        * step,
-                        dtype=np.float32,
-                    )
-                    template[f"{trg}/AXISNAME[{axis_name}]/@units"] = (
-                        f"{ureg.Unit(units)}"
-                    )
-                    if (
-                        ureg.Quantity(units).to_base_units().units
-                        == "kilogram * meter ** 2 / second ** 2"
-                    ):
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Energy ({ureg.Unit(units)})"
-                        )
+                    unit = get_unit(units)
+                    template[f"{axis_trg}/@units"] = f"{unit}"
+                    if get_base_unit(units) == "kilogram * meter ** 2 / second ** 2":
+                        template[f"{axis_trg}/@long_name"] = f"Energy ({unit})"
                     else:
-                        template[f"{trg}/AXISNAME[{axis_name}]/@long_name"] = (
-                            f"Point coordinate along {axis_name} ({ureg.Unit(units)})"
+                        template[f"{axis_trg}/@long_name"] = (
+                            f"Point coordinate along {axis_name} ({unit})"
                         )
         return template
@@ -0,0 +1,38 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Utility functions for working with nested Python dictionaries."""
+
+from typing import Any, Dict, Mapping, Optional
+
+
+def flatten_dict(
+    nested: Mapping, delimiter: str = "/", prefix: str = "", flat: Optional[Dict] = None
+) -> Dict[str, Any]:
+    """Flatten nested dictionaries into a dict with delimiter-joined keys in one pass.
+
+    Like flatdict.FlatDict, lists and empty dictionaries are kept as values.
+    """
+    if flat is None:
+        flat = {}
+    for key, value in nested.items():
+        path = f"{prefix}{delimiter}{key}" if prefix else f"{key}"
+        if isinstance(value, Mapping) and value:
+            flatten_dict(value, delimiter, path, flat)
+        else:
+            flat[path] = value
+    return flat
@@ -18,7 +18,7 @@
 """Utility function for working with mapping of Gatan DigitalMicrograph content."""
 
 from pint import UndefinedUnitError
-from pynxtools_em.utils.pint_custom_unit_registry import ureg
+from pynxtools_em.utils.pint_custom_unit_registry import get_base_unit
 
 
 def gatan_image_spectrum_or_generic_nxdata(list_of_dict) -> str:
@@ -50,8 +50,7 @@ def gatan_image_spectrum_or_generic_nxdata(list_of_dict) -> str:
             for unit in token:
                 if unit != "unitless":
                     try:
-                        q = ureg.Quantity(unit)
-                        base_unit = q.to_base_units().units
+                        base_unit = get_base_unit(unit)
                         if base_unit == "1/meter":
                             unit_categories.append("1/m")
                         elif base_unit == "meter":
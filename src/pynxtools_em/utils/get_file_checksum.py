@@ -18,16 +18,37 @@
 """Get a digital fingerprint (hash) of a file."""
 
 import hashlib
+import mmap
 
 
 DEFAULT_CHECKSUM_ALGORITHM = "sha256"
+DEFAULT_CHECKSUM_BLOCK_SIZE = 1 << 20  # 1 MiB
 
 
 def get_sha256_of_file_content(file_hdl) -> str:
     """Compute a hashvalue of given file, here SHA256."""
+    if isinstance(file_hdl, mmap.mmap):
+        # memory-mapped files are hashed zero-copy in one call
+        return str(hashlib.sha256(file_hdl).hexdigest())
     file_hdl.seek(0)
-    # Read and update hash string value in blocks of 4K
+    if hasattr(hashlib, "file_digest") and hasattr(file_hdl, "readinto"):
+        # Python >= 3.11 streams via hashlib's own C-level loop
+        return str(
+            hashlib.file_digest(file_hdl, DEFAULT_CHECKSUM_ALGORITHM).hexdigest()
+        )
     sha256_hash = hashlib.sha256()
-    for byte_block in iter(lambda: file_hdl.read(4096), b""):
-        sha256_hash.update(byte_block)
+    if hasattr(file_hdl, "readinto"):
+        # stream blocks of 1 MiB through one preallocated buffer to keep the
+        # memory footprint flat irrespective of the file size
+        buffer = bytearray(DEFAULT_CHECKSUM_BLOCK_SIZE)
+        view = memoryview(buffer)
+        while True:
+            n_bytes = file_hdl.readinto(buffer)
+            if not n_bytes:
+                break
+            sha256_hash.update(view[:n_bytes])
+    else:
+        # file-like objects which offer no readinto
+        for byte_block in iter(lambda: file_hdl.read(DEFAULT_CHECKSUM_BLOCK_SIZE), b""):
+            sha256_hash.update(byte_block)
     return str(sha256_hash.hexdigest())
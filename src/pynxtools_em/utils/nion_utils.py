@@ -17,7 +17,14 @@
 #
 """Utility functions for working with Nion Co. content and concepts."""
 
+import json
+import os
 import uuid
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+import nion.swift.model.NDataHandler as nsnd
+import numpy as np
+from pynxtools_em.utils.yaml_utils import safe_load_yaml
 
 # see https://github.com/nion-software/nionswift/blob/e95839c5602d009006ea88a648e5f78dc77c1ea4/
 # nion/swift/model/Profile.py line 146 and following
@@ -56,3 +63,78 @@ def nion_image_spectrum_or_generic_nxdata(list_of_dict) -> str:
         if len(token) >= 1:
             return "_".join(token)
     return ""
+
+
+def load_nionswift_project(file_hdl) -> dict:
+    """Load the content of a nsproj file, JSON in practice, otherwise YAML."""
+    raw = file_hdl.read()
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return safe_load_yaml(raw)
+
+
+def walk_files(
+    directory: str, visited: Optional[Set[Tuple[int, int]]] = None
+) -> Iterator[str]:
+    """Yield paths of all files in directory and its sub-directories while walking.
+
+    Like glob with **/* hidden entries are skipped and symbolic links to directories
+    are followed, each directory is walked only once to not loop on symbolic links
+    to one of its parents.
+    """
+    if visited is None:
+        visited = set()
+    try:
+        stat = os.stat(directory)
+        if (stat.st_dev, stat.st_ino) in visited:
+            return
+        visited.add((stat.st_dev, stat.st_ino))
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir():
+                    yield from walk_files(entry.path, visited)
+                elif entry.is_file():
+                    yield entry.path
+    except OSError:
+        return
+
+
+NPY_ARRAY_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def read_ndata_array(
+    file_hdl,
+    local_files: Dict[int, Tuple],
+    dir_files: Dict[bytes, Tuple[int, int]],
+    name_bytes: bytes = b"data.npy",
+    file_path: Optional[str] = None,
+) -> Optional[np.ndarray]:
+    """Read a numpy array from a *.ndata file, memory-mapped if file_path is given.
+
+    Like nsnd.read_data which copies the array into memory. Members of *.ndata files
+    are stored uncompressed, so with the file on disk the array is mapped instead.
+    """
+    if name_bytes not in dir_files:
+        return None
+    data_pos = local_files[dir_files[name_bytes][1]][1]
+    if file_path is not None:
+        file_hdl.seek(data_pos)
+        version = np.lib.format.read_magic(file_hdl)
+        if version in NPY_ARRAY_HEADER_READERS:
+            shape, fortran_order, dtype = NPY_ARRAY_HEADER_READERS[version](file_hdl)
+            if not dtype.hasobject:
+                return np.memmap(
+                    file_path,
+                    dtype=dtype,
+                    mode="r",
+                    offset=file_hdl.tell(),
+                    shape=shape,
+                    order="F" if fortran_order else "C",
+                )
+    return nsnd.read_data(file_hdl, local_files, dir_files, name_bytes)
@@ -17,5 +17,30 @@
 #
 """Constants, numerical settings, etc."""
 
+from typing import List, Sequence
+
+import numpy as np
+
 REAL_SPACE = 0
 COMPLEX_SPACE = 1
+
+
+def get_linear_axis(offset, step, count: int) -> np.ndarray:
+    """Return count equally spaced float32 positions offset + i * step."""
+    axis = np.arange(count, dtype=np.float32)
+    axis *= np.float32(step)
+    axis += np.float32(offset)
+    return axis
+
+
+def get_linear_axes(
+    offsets: Sequence, steps: Sequence, counts: Sequence[int]
+) -> List[np.ndarray]:
+    """Return get_linear_axis for each offset, step, count in one vectorized pass.
+
+    All axes are rows of one float32 array, each returned as a contiguous view.
+    """
+    grid = np.arange(max(counts, default=0), dtype=np.float32)[np.newaxis, :]
+    grid = grid * np.asarray(steps, np.float32)[:, np.newaxis]
+    grid += np.asarray(offsets, np.float32)[:, np.newaxis]
+    return [grid[idx, 0:count] for idx, count in enumerate(counts)]
@@ -17,6 +17,8 @@
 #
 """A customized unit registry for handling units with pint."""
 
+from functools import lru_cache
+
 import numpy as np
 import pint
 from pint import UnitRegistry
@@ -49,6 +51,18 @@ def is_not_special_unit(units: pint.Unit) -> bool:
     return True
 
 
+@lru_cache(maxsize=256)
+def get_unit(units: str) -> pint.Unit:
+    """Return ureg.Unit(units), parsing each distinct units string only once."""
+    return ureg.Unit(units)
+
+
+@lru_cache(maxsize=256)
+def get_base_unit(units: str) -> pint.Unit:
+    """Return the SI base units of units, resolving each distinct units string only once."""
+    return ureg.Quantity(units).to_base_units().units
+
+
 PINT_MAPPING_TESTS = {
     "use": [
         ("str_str_01", ""),
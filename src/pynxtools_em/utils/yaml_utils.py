@@ -0,0 +1,61 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Load content of YAML files with the fastest available PyYAML loader."""
+
+import copy
+import hashlib
+import os
+from functools import lru_cache
+from typing import Any, Tuple
+
+import yaml
+
+# libyaml-backed C loader if PyYAML was built with it, pure-Python fallback otherwise
+YAML_SAFE_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def safe_load_yaml(stream):
+    """Like yaml.safe_load but using the C-accelerated loader when available."""
+    return yaml.load(stream, Loader=YAML_SAFE_LOADER)
+
+
+@lru_cache(maxsize=64)
+def load_yaml_file_version(
+    file_path: str, mtime_ns: int, file_size: int
+) -> Tuple[Any, str]:
+    """Parse and SHA256-hash a YAML file once per path, modification time, and size."""
+    with open(file_path, "rb") as fp:
+        content = fp.read()
+    # hash the very bytes which are parsed instead of reading the file a second time
+    return (
+        safe_load_yaml(content.decode("utf-8")),
+        hashlib.sha256(content).hexdigest(),
+    )
+
+
+def load_yaml_file(file_path: str) -> Tuple[Any, str]:
+    """Load content and SHA256 of a YAML file, parsing it again only when changed.
+
+    A copy of the content is returned so that callers can modify it without
+    affecting the cache.
+    """
+    stat = os.stat(file_path)
+    content, sha256 = load_yaml_file_version(
+        os.path.abspath(file_path), stat.st_mtime_ns, stat.st_size
+    )
+    return copy.deepcopy(content), sha256
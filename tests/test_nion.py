@@ -0,0 +1,214 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests of reading nionswift projects and their *.ndata files."""
+
+import json
+import os
+import re
+import tempfile
+import uuid
+import zipfile
+
+import h5py
+import nion.swift.model.NDataHandler as nsnd
+import numpy as np
+import pytest
+from pynxtools_em.parsers import nxs_nion
+from pynxtools_em.parsers.nxs_nion import NionProjectParser
+from pynxtools_em.utils.nion_utils import (
+    read_ndata_array,
+    uuid_to_file_name,
+    walk_files,
+)
+
+
+def write_nionswift_project(directory, zipped: bool) -> str:
+    """Write a nionswift project with two *.ndata and one *.h5 file."""
+    uuids = [str(uuid.UUID(int=idx + 1)) for idx in range(3)]
+    project = {
+        "display_items": [
+            {
+                "type": "display_item",
+                "uuid": str(uuid.uuid4()),
+                "created": "2024-05-08T12:56:00.000000",
+                "display_data_channels": [{"data_item_reference": data_uuid}],
+            }
+            for data_uuid in uuids
+        ]
+    }
+    data_dir = directory / "project Data"
+    data_dir.mkdir()
+    nsnd.write_zip(
+        str(data_dir / f"{uuid_to_file_name(uuids[0])}.ndata"),
+        np.arange(20, dtype=np.float32).reshape(4, 5),
+        {
+            "title": "image",
+            "dimensional_calibrations": [
+                {"offset": 0.0, "scale": 1.0, "units": "nm"},
+                {"offset": 1.0, "scale": 2.0, "units": "nm"},
+            ],
+        },
+    )
+    nsnd.write_zip(
+        str(data_dir / f"{uuid_to_file_name(uuids[1])}.ndata"),
+        np.arange(7, dtype=np.float32),
+        {
+            "title": "spectrum",
+            "dimensional_calibrations": [{"offset": 0.5, "scale": 0.1, "units": "eV"}],
+        },
+    )
+    with h5py.File(data_dir / f"{uuid_to_file_name(uuids[2])}.h5", "w") as h5w:
+        dst = h5w.create_dataset("data", data=np.ones((3, 2), np.float32))
+        dst.attrs["properties"] = json.dumps(
+            {
+                "title": "hfive",
+                "dimensional_calibrations": [
+                    {"offset": 0.0, "scale": 1.0, "units": "nm"},
+                    {"offset": 0.0, "scale": 1.0, "units": "nm"},
+                ],
+            }
+        )
+    if not zipped:
+        file_path = directory / "project.nsproj"
+        file_path.write_text(json.dumps(project))
+        return str(file_path)
+    file_path = directory / "project.zip"
+    with zipfile.ZipFile(file_path, "w", zipfile.ZIP_DEFLATED) as zip_file_hdl:
+        zip_file_hdl.writestr("project/project.nsproj", json.dumps(project))
+        for data_file in sorted(data_dir.iterdir()):
+            zip_file_hdl.write(data_file, f"project/project Data/{data_file.name}")
+    return str(file_path)
+
+
+@pytest.mark.parametrize("file_path", [None, "data.ndata"])
+def test_read_ndata_array(tmp_path, file_path):
+    """Test that the data.npy of an *.ndata file reads back identically."""
+    ndata_path = tmp_path / "data.ndata"
+    expected = np.arange(24, dtype=np.uint16).reshape(2, 3, 4)
+    nsnd.write_zip(str(ndata_path), expected, {"title": "test"})
+    with open(ndata_path, "rb") as file_hdl:
+        local_files, dir_files, _ = nsnd.parse_zip(file_hdl)
+        nparr = read_ndata_array(
+            file_hdl,
+            local_files,
+            dir_files,
+            b"data.npy",
+            str(ndata_path) if file_path else None,
+        )
+        assert nparr.dtype == expected.dtype
+        assert np.array_equal(nparr, expected)
+        assert read_ndata_array(file_hdl, local_files, dir_files, b"none.npy") is None
+
+
+@pytest.mark.parametrize("zipped", [True, False])
+def test_parse_nionswift_project_twice(tmp_path, zipped):
+    """Test that parsing a project again with the same parser gives the same result."""
+    parser = NionProjectParser(write_nionswift_project(tmp_path, zipped))
+    assert parser.supported
+    first: dict = {}
+    parser.parse(first)
+    second: dict = {}
+    parser.parse(second)
+    assert len(first) > 0
+    # event identifiers continue counting across parse calls of the same parser
+    assert len(first) == len(second)
+    assert {re.sub(r"event_data_em\d+", "", key) for key in first} == {
+        re.sub(r"event_data_em\d+", "", key) for key in second
+    }
+    # axis positions are offset + i * scale
+    axes = [
+        value.tolist()
+        for key, value in first.items()
+        if key.endswith(("/AXISNAME[axis_i]", "/AXISNAME[axis_energy]"))
+    ]
+    assert [1.0, 3.0, 5.0, 7.0, 9.0] in axes
+    assert any(
+        len(axis) == 7 and np.allclose(axis, 0.5 + 0.1 * np.arange(7)) for axis in axes
+    )
+
+
+def test_parse_large_members_via_temporary_files(tmp_path, monkeypatch):
+    """Test that members decompressed into temporary files give the same result."""
+    file_path = write_nionswift_project(tmp_path, zipped=True)
+    in_memory: dict = {}
+    NionProjectParser(file_path).parse(in_memory)
+
+    temporary_files = []
+
+    def named_temporary_file(*args, **kwargs):
+        temporary_files.append(named_temporary_file_orig(*args, **kwargs))
+        return temporary_files[-1]
+
+    named_temporary_file_orig = tempfile.NamedTemporaryFile
+    monkeypatch.setattr(tempfile, "NamedTemporaryFile", named_temporary_file)
+    monkeypatch.setattr(nxs_nion, "NION_IN_MEMORY_MAX_SIZE", 0)
+    on_disk: dict = {}
+    NionProjectParser(file_path).parse(on_disk)
+    if os.name == "posix":
+        assert len(temporary_files) == 3
+        assert all(file_hdl.closed for file_hdl in temporary_files)
+    assert len(in_memory) > 0
+    np.testing.assert_equal(on_disk, in_memory)
+
+
+def test_parse_closes_members_decompressed_ahead_on_error(tmp_path):
+    """Test that a failing display item leaves no member open behind the parser."""
+    parser = NionProjectParser(write_nionswift_project(tmp_path, zipped=True))
+    opened = []
+    open_member = parser.open_member
+
+    def open_and_record_member(file_name):
+        opened.append(open_member(file_name))
+        return opened[-1]
+
+    def process(file_hdl, full_path, template):
+        raise RuntimeError(f"failed to process {full_path}")
+
+    parser.open_member = open_and_record_member
+    parser.process_ndata = parser.process_hfive = process
+    with pytest.raises(RuntimeError):
+        parser.parse({})
+    # the failing member and the one decompressed ahead of it
+    assert len(opened) == 2
+    assert all(file_hdl.closed for file_hdl in opened)
+    assert parser.zip_file_hdl is None
+
+
+@pytest.mark.skipif(os.name != "posix", reason="symbolic links need privileges")
+def test_walk_files_follows_symbolic_links_once(tmp_path):
+    """Test that walk_files skips hidden entries and follows symbolic links once."""
+    data_dir = tmp_path / "project Data"
+    (data_dir / "sub").mkdir(parents=True)
+    (data_dir / ".cache").mkdir()
+    (tmp_path / "external").mkdir()
+    for file_path in [
+        data_dir / "a.ndata",
+        data_dir / ".b.ndata",
+        data_dir / ".cache" / "c.ndata",
+        data_dir / "sub" / "d.h5",
+        tmp_path / "external" / "e.ndata",
+    ]:
+        file_path.write_bytes(b"")
+    (data_dir / "link").symlink_to(tmp_path / "external", target_is_directory=True)
+    (data_dir / "sub" / "loop").symlink_to(data_dir, target_is_directory=True)
+    assert sorted(walk_files(str(data_dir))) == [
+        str(data_dir / "a.ndata"),
+        str(data_dir / "link" / "e.ndata"),
+        str(data_dir / "sub" / "d.h5"),
+    ]
+    assert list(walk_files(str(tmp_path / "missing"))) == []
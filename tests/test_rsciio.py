@@ -0,0 +1,121 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests of the parsers which read content via rosettasciio."""
+
+import dask.array as da
+import numpy as np
+import pytest
+from pynxtools_em.parsers import rsciio_bruker, rsciio_gatan
+from pynxtools_em.parsers.rsciio_bruker import RsciioBrukerParser
+from pynxtools_em.parsers.rsciio_gatan import RsciioGatanParser
+
+
+@pytest.mark.parametrize(
+    "file_name,content,supported",
+    [
+        ("map.bcf", b"AAMVHFSS" + bytes(504), True),
+        ("map.bcf", b"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1" + bytes(504), False),
+        ("spectrum.spx", b'<?xml version="1.0" encoding="WINDOWS-1252"?>', True),
+        ("spectrum.txt", b"AAMVHFSS", False),
+    ],
+)
+def test_bruker_check_reads_only_the_signature(
+    tmp_path, monkeypatch, file_name, content, supported
+):
+    """Test that BCF and SPX files are recognized without reading their content."""
+
+    def file_reader(*args, **kwargs):
+        raise AssertionError("content must be read only when parse is called")
+
+    monkeypatch.setattr(rsciio_bruker.bruker, "file_reader", file_reader)
+    file_path = tmp_path / file_name
+    file_path.write_bytes(content)
+    assert RsciioBrukerParser(str(file_path)).supported == supported
+
+
+def gatan_image(data) -> dict:
+    """Return an image object as the rosettasciio digitalmicrograph reader does."""
+    return {
+        "data": data,
+        "axes": [
+            {
+                "name": name,
+                "size": size,
+                "index_in_array": idx,
+                "scale": 0.5,
+                "offset": 0.0,
+                "units": "nm",
+                "navigate": False,
+            }
+            for idx, (name, size) in enumerate(zip(("y", "x"), data.shape))
+        ],
+        "metadata": {"General": {"title": "image"}},
+        "original_metadata": {},
+        "mapping": {},
+    }
+
+
+def test_gatan_arrays_are_read_when_parsed(tmp_path, monkeypatch):
+    """Test that the check reads lazily and parse writes numpy arrays."""
+    expected = np.arange(12, dtype=np.float32).reshape(3, 4)
+    calls = []
+
+    def file_reader(*args, **kwargs):
+        calls.append(kwargs)
+        return [gatan_image(da.from_array(expected, chunks=(1, 4)))]
+
+    monkeypatch.setattr(rsciio_gatan.gatan, "file_reader", file_reader)
+    file_path = tmp_path / "image.dm4"
+    file_path.write_bytes(b"\x00\x00\x00\x04" + bytes(60))
+    parser = RsciioGatanParser(str(file_path))
+    assert parser.supported
+    assert [kwargs["lazy"] for kwargs in calls] == [True]
+    template = parser.parse({})
+    arrays = [
+        value["compress"]
+        for value in template.values()
+        if isinstance(value, dict) and "compress" in value
+    ]
+    assert len(arrays) == 1
+    assert isinstance(arrays[0], np.ndarray)
+    assert np.array_equal(arrays[0], expected)
+
+
+def test_gatan_check_reads_rgb_images_eagerly(tmp_path, monkeypatch):
+    """Test that files which rosettasciio cannot read lazily are read eagerly."""
+    expected = np.arange(12, dtype=np.float32).reshape(3, 4)
+    calls = []
+
+    def file_reader(*args, **kwargs):
+        calls.append(kwargs)
+        if kwargs["lazy"]:
+            # as ImageObject.get_data does for RGB(A) images, i.e. DataType 8 and 23
+            raise ValueError("Lazy loading of RGBA images is not supported.")
+        return [gatan_image(expected)]
+
+    monkeypatch.setattr(rsciio_gatan.gatan, "file_reader", file_reader)
+    file_path = tmp_path / "image.dm3"
+    file_path.write_bytes(b"\x00\x00\x00\x03" + bytes(60))
+    parser = RsciioGatanParser(str(file_path))
+    assert parser.supported
+    assert [kwargs["lazy"] for kwargs in calls] == [True, False]
+    template = parser.parse({})
+    assert any(
+        isinstance(value, dict) and np.array_equal(value.get("compress"), expected)
+        for value in template.values()
+    )
@@ -0,0 +1,73 @@
+#
+# Copyright The NOMAD Authors.
+#
+# This file is part of NOMAD. See https://nomad-lab.eu for further info.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+"""Tests of the utility functions in pynxtools_em.utils."""
+
+import flatdict as fd
+import numpy as np
+from pynxtools_em.utils.dict_utils import flatten_dict
+from pynxtools_em.utils.numerics import get_linear_axes, get_linear_axis
+from pynxtools_em.utils.yaml_utils import load_yaml_file
+
+
+def test_flatten_dict_matches_flatdict():
+    """Test that flatten_dict yields the same leaves as flatdict.FlatDict."""
+    nested = {
+        "entry": {"title": "test", "start_time": "2024-05-08T12:56:00+00:00"},
+        "user": [{"name": "a"}, {"name": "b"}],
+        "sample": {"atom_types": ["Al", "Cu"], "thickness": {"value": 1.0}},
+        "empty": {},
+        "scalar": 1,
+    }
+    flat = flatten_dict(nested)
+    expected = fd.FlatDict(nested, "/")
+    assert sorted(flat.keys()) == sorted(expected.keys())
+    for key, value in flat.items():
+        expected_value = expected[key]
+        if isinstance(expected_value, fd.FlatDict):
+            expected_value = expected_value.as_dict()
+        assert value == expected_value
+
+
+def test_get_linear_axis():
+    """Test that axis positions are offset + i * step in float32."""
+    axis = get_linear_axis(1.0, 2.0, 3)
+    assert axis.dtype == np.float32
+    assert np.array_equal(axis, np.asarray([1.0, 3.0, 5.0], np.float32))
+    assert get_linear_axis(0.5, 0.1, 0).shape == (0,)
+
+
+def test_get_linear_axes():
+    """Test that the vectorized variant matches get_linear_axis for each axis."""
+    offsets, steps, counts = [1.0, -0.5, 0.0], [2.0, 0.25, 1.0], [3, 5, 1]
+    axes = get_linear_axes(offsets, steps, counts)
+    assert len(axes) == 3
+    for axis, offset, step, count in zip(axes, offsets, steps, counts):
+        assert axis.dtype == np.float32
+        assert np.array_equal(axis, get_linear_axis(offset, step, count))
+
+
+def test_load_yaml_file_returns_copies(tmp_path):
+    """Test that modifying loaded content does not affect later loads of the file."""
+    file_path = tmp_path / "eln_data.yaml"
+    file_path.write_text("entry:\n  title: test\nuser:\n- name: a\n")
+    first, first_sha256 = load_yaml_file(str(file_path))
+    first["entry"]["title"] = "modified"
+    first["user"].append({"name": "b"})
+    second, second_sha256 = load_yaml_file(str(file_path))
+    assert second == {"entry": {"title": "test"}, "user": [{"name": "a"}]}
+    assert first_sha256 == second_sha256